@@ -1,12 +1,85 @@
 #!/usr/bin/env python3
 """Build and serve MobileWheelsDatabase with MkDocs"""
 
+import hashlib
 import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
 
 
+# Build cache, kept out of docs_dir so MkDocs never publishes it
+_BUILD_DIR = Path(__file__).parent / '.build'
+
+
+def _install(src, dest):
+    """
+    Copy src to dest atomically: stage at a hidden '.<name>.tmp' beside
+    dest, then os.replace it into place.
+    
+    A real copy, never a hardlink, so build.sh's `cp` onto dest cannot
+    write through into SwiftPM's build output. shutil.copy2 copies in
+    kernel (sendfile / fcopyfile) on the supported Python versions.
+    """
+    tmp = dest.with_name(f'.{dest.name}.tmp')
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _is_current(src, dest):
+    """
+    Check whether dest is an unmodified copy of src.
+    
+    _install copies with shutil.copy2, which preserves mtimes, so matching
+    size and mtime_ns is enough; no need to read the multi-MB WASM.
+    """
+    try:
+        dest_stat = dest.stat()
+    except FileNotFoundError:
+        return False
+    src_stat = src.stat()
+    return (dest_stat.st_size, dest_stat.st_mtime_ns) == (src_stat.st_size, src_stat.st_mtime_ns)
+
+
+def _source_hash(project_root, build_config):
+    """
+    Fingerprint the Swift sources by (path, mtime_ns, size) of every file
+    under Sources/ plus Package.swift, without reading their contents.
+    
+    build_config (toolchain and build command) is hashed in as well, so a
+    toolchain or flag change invalidates the cache.
+    """
+    entries = []
+    
+    def walk(directory):
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    walk(entry.path)
+                elif entry.is_file():
+                    st = entry.stat()
+                    entries.append((os.path.relpath(entry.path, project_root), st.st_mtime_ns, st.st_size))
+    
+    sources_dir = project_root / 'Sources'
+    if sources_dir.exists():
+        walk(sources_dir)
+    manifest = project_root / 'Package.swift'
+    if manifest.exists():
+        st = manifest.stat()
+        entries.append(('Package.swift', st.st_mtime_ns, st.st_size))
+    
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\0'.join(build_config).encode() + b'\n')
+    for path, mtime_ns, size in sorted(entries):
+        digest.update(f'{path}\0{mtime_ns}\0{size}\n'.encode())
+    return digest.hexdigest()
+
+
 def main():
     # Get the project root directory (where this script is located)
     project_root = Path(__file__).parent
@@ -16,9 +89,6 @@ def main():
     wasm_dest = project_root / 'MobileWheelsDatabaseWasm.wasm'
     skip_build = '--skip-build' in sys.argv or os.environ.get('SKIP_BUILD') == '1'
     
-    if not skip_build:
-        print("🔨 Building Swift WASM...")
-    
     # Set up environment for Swift WASM
     env = os.environ.copy()
     env['TOOLCHAINS'] = 'swift-wasm-6.2.1-RELEASE'
@@ -33,45 +103,70 @@ def main():
         '-Xswiftc', '-mexec-model=reactor'
     ]
     
-    try:
-        subprocess.run(build_cmd, env=env, check=True)
-        
-        print("📦 Copying WASM binary...")
-        
-        # Copy WASM binary
-        wasm_src = project_root / '.build' / 'wasm32-unknown-wasip1' / 'release' / 'MobileWheelsDatabaseWasm.wasm'
-        wasm_dest = project_root / 'MobileWheelsDatabaseWasm.wasm'
-        wasm_docs = project_root / 'docs' / 'assets' / 'MobileWheelsDatabase.wasm'
+    sources_hash = _source_hash(project_root, [env['TOOLCHAINS'], *build_cmd])
+    sources_hash_path = _BUILD_DIR / '.src_hash'
+    
+    # --clean-cache forgets the cached source hash, forcing a rebuild
+    if '--clean-cache' in sys.argv:
+        sources_hash_path.unlink(missing_ok=True)
+        print("🧹 Cleared build cache")
+    
+    # Auto-skip when the Swift sources are unchanged since the last build
+    auto_skipped = False
+    if not skip_build and wasm_dest.exists() and sources_hash_path.exists():
+        if sources_hash_path.read_text().strip() == sources_hash:
+            skip_build = auto_skipped = True
+    
+    if not skip_build:
+        print("🔨 Building Swift WASM...")
         
-        if wasm_src.exists():
-            import shutil
-            shutil.copy(wasm_src, wasm_dest)
+        try:
+            subprocess.run(build_cmd, env=env, check=True)
             
-            # Copy to docs directory
-            wasm_docs.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy(wasm_src, wasm_docs)
+            print("📦 Copying WASM binary...")
             
-            size = wasm_dest.stat().st_size / (1024 * 1024)
-            print(f"✅ WASM built: {size:.2f} MB")
-            print(f"✅ Files copied to docs/assets/")
-        else:
-            print("❌ WASM binary not found!", file=sys.stderr)
+            # Copy WASM binary
+            wasm_src = project_root / '.build' / 'wasm32-unknown-wasip1' / 'release' / 'MobileWheelsDatabaseWasm.wasm'
+            wasm_dest = project_root / 'MobileWheelsDatabaseWasm.wasm'
+            wasm_docs = project_root / 'docs' / 'assets' / 'MobileWheelsDatabase.wasm'
+            
+            if wasm_src.exists():
+                wasm_docs.parent.mkdir(parents=True, exist_ok=True)
+                
+                # Skip both copies when the built WASM is unchanged
+                if _is_current(wasm_src, wasm_dest) and _is_current(wasm_src, wasm_docs):
+                    size = wasm_dest.stat().st_size / (1024 * 1024)
+                    print(f"✅ WASM unchanged: {size:.2f} MB")
+                    print("⏭️  docs/assets/ already up to date")
+                else:
+                    for dest in (wasm_dest, wasm_docs):
+                        _install(wasm_src, dest)
+                    
+                    size = wasm_dest.stat().st_size / (1024 * 1024)
+                    print(f"✅ WASM built: {size:.2f} MB")
+                    print(f"✅ Files copied to docs/assets/")
+            else:
+                print("❌ WASM binary not found!", file=sys.stderr)
+                sys.exit(1)
+            
+            sources_hash_path.write_text(sources_hash)
+            
+            print()
+            print("🎉 Build complete!")
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Build failed: {e}", file=sys.stderr)
             sys.exit(1)
-        
-        print()
-        print("🎉 Build complete!")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Build failed: {e}", file=sys.stderr)
-        sys.exit(1)
     else:
-        print("⏭️  Skipping build (use without --skip-build to rebuild)")
+        if auto_skipped:
+            print("⏭️  Swift sources unchanged, skipping build (use --clean-cache to rebuild)")
+        else:
+            print("⏭️  Skipping build (use without --skip-build to rebuild)")
         if wasm_dest.exists():
             # Still copy to docs if needed
-            import shutil
             wasm_docs = project_root / 'docs' / 'assets' / 'MobileWheelsDatabase.wasm'
             wasm_docs.parent.mkdir(parents=True, exist_ok=True)
-            if not wasm_docs.exists() or wasm_dest.stat().st_mtime > wasm_docs.stat().st_mtime:
-                shutil.copy(wasm_dest, wasm_docs)
+            if not _is_current(wasm_dest, wasm_docs):
+                _install(wasm_dest, wasm_docs)
                 print("✅ Copied existing WASM to docs/assets/")
     
     print()
@@ -0,0 +1,179 @@
+"""
+File copy and download helpers for the MobileWheels plugin.
+
+The plugin ships multi-MB assets (the WASM binary and SQLite databases), so
+copies prefer reflinks and hardlinks over rewriting the data.
+"""
+
+import json
+import os
+import shutil
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+_BUFFER_SIZE = 1 << 20
+
+
+def _copy_file_range(src, dst):
+    """
+    Copy src to dst with os.copy_file_range, which reflinks on CoW filesystems.
+
+    Raises OSError if the kernel or filesystem cannot copy the whole file.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        copied = 0
+        while copied < size:
+            n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+            if n == 0:
+                raise OSError(f'copy_file_range stopped after {copied} of {size} bytes')
+            copied += n
+
+
+def _fastcopy(src, dst):
+    """
+    Copy src to dst, preserving metadata like shutil.copy2.
+
+    shutil already copies in kernel (sendfile on Linux, fcopyfile on macOS)
+    but never via copy_file_range, so on btrfs/xfs it rewrites every block
+    of the multi-MB WASM that copy_file_range would simply reflink. Try that
+    first and leave every other platform and failure to shutil.copy2.
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            _copy_file_range(src, dst)
+        except OSError:
+            pass
+        else:
+            shutil.copystat(src, dst)
+            return
+    shutil.copy2(src, dst)
+
+
+def _link_or_copy(src, dst):
+    """
+    Hardlink src to dst when both are on the same device, else _fastcopy.
+
+    The link or copy is staged at a hidden '.<name>.tmp' beside dst (which
+    MkDocs ignores when scanning docs_dir) and moved into place with
+    os.replace, so an interrupted install never leaves a truncated dst.
+    Only safe for files that are never modified in place, so it is used for
+    site_dir outputs alone; MkDocs and the browser only read those.
+    """
+    try:
+        if os.path.samefile(src, dst):
+            return
+    except FileNotFoundError:
+        pass
+
+    head, tail = os.path.split(os.fspath(dst))
+    tmp = os.path.join(head, f'.{tail}.tmp')
+    try:
+        os.unlink(tmp)
+    except FileNotFoundError:
+        pass
+    try:
+        try:
+            if os.stat(src).st_dev != os.stat(os.path.dirname(tmp) or '.').st_dev:
+                raise OSError('cross-device')
+            os.link(src, tmp)
+        except OSError:
+            _fastcopy(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _needs_copy(src_stat, dst):
+    """
+    Check whether dst is missing or older than the source described by src_stat.
+
+    A destination with the same size and an mtime at least as new as the
+    source is considered up to date (_fastcopy preserves mtimes).
+    """
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return True
+    return dst_stat.st_size != src_stat.st_size or dst_stat.st_mtime < src_stat.st_mtime
+
+
+def _copy_all(pairs, copy=_fastcopy):
+    """
+    Copy each (src, dst) pair, concurrently when there is more than one.
+
+    The copies are independent and I/O bound, so a small thread pool
+    overlaps them; a single file skips the pool startup cost.
+    """
+    if len(pairs) <= 1:
+        for src, dst in pairs:
+            copy(src, dst)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1, len(pairs))) as pool:
+        list(pool.map(lambda pair: copy(*pair), pairs))
+
+
+def _read_meta(meta_path):
+    """Return the download metadata cached in meta_path, or {} if unreadable."""
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _is_unchanged(url, dest, meta_path):
+    """
+    Check with a HEAD request whether dest still matches the remote file.
+
+    Compares the remote ETag and Content-Length with the values recorded in
+    meta_path by the last _download, so an unchanged file is not fetched.
+    """
+    if not dest.exists():
+        return False
+    meta = _read_meta(meta_path)
+    if not meta:
+        return False
+
+    request = urllib.request.Request(url, method='HEAD')
+    with urllib.request.urlopen(request, timeout=10) as resp:
+        etag = resp.headers.get('ETag')
+        length = resp.headers.get('Content-Length')
+    if etag is None or length is None:
+        return False
+    return meta.get('etag') == etag and meta.get('size') == int(length) == dest.stat().st_size
+
+
+def _download(url, dest, meta_path):
+    """
+    Download url to dest, revalidating against the ETag cached in meta_path.
+
+    The body is streamed in 1 MiB chunks to a .part file and moved into
+    place atomically, so an interrupted build never leaves a truncated dest.
+    The ETag and size are recorded in meta_path for _is_unchanged.
+    Returns False if the server answered 304 Not Modified, True otherwise.
+    """
+    request = urllib.request.Request(url)
+    etag = _read_meta(meta_path).get('etag') if dest.exists() else None
+    if etag:
+        request.add_header('If-None-Match', etag)
+
+    part_path = dest.with_suffix('.part')
+    try:
+        with urllib.request.urlopen(request, timeout=60) as resp, open(part_path, 'wb') as f:
+            shutil.copyfileobj(resp, f, length=_BUFFER_SIZE)
+            etag = resp.headers.get('ETag')
+    except BaseException as e:
+        part_path.unlink(missing_ok=True)
+        if isinstance(e, urllib.error.HTTPError) and e.code == 304:
+            return False
+        raise
+    os.replace(part_path, dest)
+
+    meta_path.write_text(json.dumps({'etag': etag, 'size': dest.stat().st_size}))
+    return True
@@ -5,12 +5,14 @@ Adds a Python package compatibility search page to MkDocs sites.
 """
 
 import os
-import shutil
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urlparse
 from mkdocs.config import config_options
 from mkdocs.plugins import BasePlugin
 
+from ._io import _copy_all, _download, _is_unchanged, _link_or_copy, _needs_copy
+
 
 class MobileWheelsPlugin(BasePlugin):
     """
@@ -33,9 +35,15 @@ class MobileWheelsPlugin(BasePlugin):
         ('wasm_release', config_options.Type(str, default='latest')),
     )
     
-    def on_config(self, config):
+    def on_startup(self, *, command, dirty):
+        """
+        Resolve plugin paths and enumerate assets once per MkDocs session.
         """
-        Add the search page to the MkDocs configuration.
+        self._scan_assets()
+    
+    def _scan_assets(self):
+        """
+        Store the plugin paths and the (name, path, stat) of each bundled asset.
         """
         # Get plugin directory
         plugin_dir = Path(__file__).parent
@@ -45,6 +53,46 @@ class MobileWheelsPlugin(BasePlugin):
         self.plugin_dir = plugin_dir
         self.assets_dir = assets_dir
         
+        # Assets ship with the plugin, so list and stat them only once
+        # (scandir reads the file type from the dirent, avoiding a stat per entry)
+        self._asset_items = []
+        if assets_dir.exists():
+            with os.scandir(assets_dir) as it:
+                for entry in it:
+                    if entry.is_file():
+                        self._asset_items.append((entry.name, entry.path, entry.stat()))
+    
+    def on_config(self, config):
+        """
+        Precompute per-build values used by the page hooks.
+        """
+        # Builds started without the CLI (mkdocs.commands.build.build) skip on_startup
+        if not hasattr(self, '_asset_items'):
+            self._scan_assets()
+        
+        # Source path of the search page, compared once per rendered page
+        page_path = self.config.get('page_path')
+        self._target_src_path = f"{page_path}.md" if page_path else None
+        
+        # Bind the remaining options once instead of looking them up per hook call
+        self._db_url_override = self.config.get('database_url')
+        self._wasm_release = self.config.get('wasm_release') or 'latest'
+        
+        # A WASM here is bundled with the docs and reaches site_dir via MkDocs
+        self._docs_wasm = Path(config['docs_dir']) / 'mobilewheels_assets' / 'MobileWheelsDatabase.wasm'
+        
+        # Downloaded WASM lives outside site_dir, which MkDocs wipes on
+        # every clean build, so it and its metadata survive between builds
+        config_file = config['config_file_path']
+        project_dir = Path(config_file).parent if config_file else Path.cwd()
+        self._wasm_cache_dir = (
+            project_dir / '.cache' / 'plugin' / 'mobilewheelsdb' / self._wasm_release.replace('/', '_')
+        )
+        
+        # site_url and database_url are fixed for the build, so the
+        # injection only needs building once rather than per page
+        self._injection = self._build_injection(config)
+        
         return config
     
     def on_files(self, files, config):
@@ -57,10 +105,12 @@ class MobileWheelsPlugin(BasePlugin):
         target_assets.mkdir(exist_ok=True)
         
         # Copy all assets from plugin to docs
-        if self.assets_dir.exists():
-            for item in self.assets_dir.iterdir():
-                if item.is_file():
-                    shutil.copy2(item, target_assets / item.name)
+        files_to_copy = []
+        for name, src, src_stat in self._asset_items:
+            target = target_assets / name
+            if _needs_copy(src_stat, target):
+                files_to_copy.append((src, target))
+        _copy_all(files_to_copy)
         
         return files
     
@@ -68,38 +118,35 @@ class MobileWheelsPlugin(BasePlugin):
         """
         Inject the search scripts if this is the package search page.
         """
-        page_path = self.config.get('page_path')
-        
         # Only inject if page_path is configured and matches current page
-        if page_path and page.file.src_path == f"{page_path}.md":
-            # Get the base URL from config (handles sites with base paths like /Py-Swift/)
-            base_url = config.get('site_url', '').rstrip('/')
-            if base_url:
-                # Extract just the path component if it's a full URL
-                from urllib.parse import urlparse
-                parsed = urlparse(base_url)
-                base_path = parsed.path.rstrip('/')
-            else:
-                base_path = ''
-            
-            # Get database URL (use plugin config or construct from base path)
-            if self.config.get('database_url'):
-                db_url = self.config.get('database_url').rstrip('/') + '/'
-            else:
-                db_url = f'{base_path}/mobilewheels_assets/' if base_path else '/mobilewheels_assets/'
-            
-            # Inject script configuration and loader
-            injection = f'''
+        if self._target_src_path is None or page.file.src_path != self._target_src_path:
+            return html
+        
+        # Append to existing HTML instead of replacing
+        return html + self._injection
+    
+    def _build_injection(self, config):
+        """
+        Build the script configuration and loader HTML for the search page.
+        """
+        # Get the base URL from config (handles sites with base paths like /Py-Swift/)
+        base_url = (config.get('site_url') or '').rstrip('/')
+        # Extract just the path component if it's a full URL
+        base_path = urlparse(base_url).path.rstrip('/') if base_url else ''
+        
+        # Get database URL (use plugin config or construct from base path)
+        if self._db_url_override:
+            db_url = self._db_url_override.rstrip('/') + '/'
+        else:
+            db_url = f'{base_path}/mobilewheels_assets/' if base_path else '/mobilewheels_assets/'
+        
+        # Inject script configuration and loader
+        return f'''
 <script>
   window.MOBILEWHEELS_DB_URL = '{db_url}';
 </script>
 <script src="{db_url}package-search.js"></script>
 '''
-            
-            # Append to existing HTML instead of replacing
-            return html + injection
-        
-        return html
     
     def on_post_build(self, config):
         """
@@ -109,33 +156,82 @@ class MobileWheelsPlugin(BasePlugin):
         target_assets = site_dir / 'mobilewheels_assets'
         target_assets.mkdir(exist_ok=True)
         
-        # Copy all assets except WASM (databases and JS)
-        if self.assets_dir.exists():
-            for item in self.assets_dir.iterdir():
-                if item.is_file() and not item.name.endswith('.wasm'):
-                    target_file = target_assets / item.name
-                    shutil.copy2(item, target_file)
+        # Start the WASM download first so the network wait overlaps the copies
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            wasm_future = pool.submit(self._install_wasm, target_assets)
+            
+            # Copy all assets except WASM (databases and JS)
+            files_to_copy = []
+            for name, src, src_stat in self._asset_items:
+                if not name.endswith('.wasm'):
+                    target_file = target_assets / name
+                    if _needs_copy(src_stat, target_file):
+                        files_to_copy.append((src, target_file))
+            _copy_all(files_to_copy, copy=_link_or_copy)
+            
+            wasm_future.result()
         
-        # Download WASM from GitHub releases
+        return None
+    
+    def _install_wasm(self, target_assets):
+        """
+        Download the WASM from GitHub releases, falling back to the bundled copy.
+        """
         wasm_path = target_assets / 'MobileWheelsDatabase.wasm'
-        if not wasm_path.exists():
-            release_tag = self.config.get('wasm_release', 'latest')
-            wasm_url = f'https://github.com/Py-Swift/MobileWheelsDatabase/releases/{release_tag}/download/MobileWheelsDatabase.wasm'
+        # A bundled WASM in docs_dir was already copied over by MkDocs.
+        # site_dir itself is no guide: --dirty keeps old downloads there.
+        if self._docs_wasm.exists():
+            return
+        
+        cached_wasm = self._wasm_cache_dir / 'MobileWheelsDatabase.wasm'
+        meta_path = cached_wasm.with_suffix('.wasm.meta.json')
+        release_tag = self._wasm_release
+        wasm_url = f'https://github.com/Py-Swift/MobileWheelsDatabase/releases/{release_tag}/download/MobileWheelsDatabase.wasm'
+        
+        # Skip the download when ETag and size match the cached copy
+        try:
+            unchanged = _is_unchanged(wasm_url, cached_wasm, meta_path)
+        except Exception as e:
+            print(f'Warning: Failed to check WASM release: {e}')
+            unchanged = False
+        if unchanged:
+            print(f'✓ Cached WASM up to date with GitHub release ({release_tag})')
+            self._place_wasm(cached_wasm, wasm_path)
+            return
+        
+        print(f'Downloading WASM from GitHub release ({release_tag})...')
+        try:
+            self._wasm_cache_dir.mkdir(parents=True, exist_ok=True)
+            downloaded = _download(wasm_url, cached_wasm, meta_path)
+        except Exception as e:
+            print(f'Warning: Failed to download WASM from release: {e}')
+            print('Checking for bundled WASM...')
             
-            print(f'Downloading WASM from GitHub release ({release_tag})...')
-            try:
-                urllib.request.urlretrieve(wasm_url, wasm_path)
-                print(f'✓ WASM downloaded successfully ({wasm_path.stat().st_size / 1024 / 1024:.1f} MB)')
-            except Exception as e:
-                print(f'Warning: Failed to download WASM from release: {e}')
-                print('Checking for bundled WASM...')
-                
-                # Fallback: check if WASM is bundled in assets
-                bundled_wasm = self.assets_dir / 'MobileWheelsDatabase.wasm'
-                if bundled_wasm.exists():
-                    shutil.copy2(bundled_wasm, wasm_path)
+            # Fallback: check if WASM is bundled in assets
+            bundled_wasm = self.assets_dir / 'MobileWheelsDatabase.wasm'
+            if cached_wasm.exists():
+                if self._place_wasm(cached_wasm, wasm_path):
+                    print('✓ Using previously downloaded WASM')
+            elif bundled_wasm.exists():
+                if self._place_wasm(bundled_wasm, wasm_path):
                     print('✓ Using bundled WASM')
-                else:
-                    print('ERROR: No WASM file available. Please build or download manually.')
+            else:
+                print('ERROR: No WASM file available. Please build or download manually.')
+            return
         
-        return None
+        if downloaded:
+            print(f'✓ WASM downloaded successfully ({cached_wasm.stat().st_size / 1024 / 1024:.1f} MB)')
+        else:
+            print('✓ WASM unchanged since last download')
+        self._place_wasm(cached_wasm, wasm_path)
+    
+    def _place_wasm(self, src, wasm_path):
+        """
+        Link or copy a WASM into site_dir, warning instead of failing the build.
+        """
+        try:
+            _link_or_copy(src, wasm_path)
+        except OSError as e:
+            print(f'Warning: Failed to install WASM into the site: {e}')
+            return False
+        return True
@@ -0,0 +1,59 @@
+import errno
+import os
+
+import pytest
+
+from mkdocs_mobilewheelsdb import _io
+
+
+@pytest.fixture
+def src(tmp_path):
+    path = tmp_path / 'src.wasm'
+    path.write_bytes(os.urandom(3 * (1 << 20) + 123))
+    os.utime(path, ns=(1_600_000_000_000_000_000, 1_600_000_000_000_000_000))
+    return path
+
+
+def assert_copied(src, dst):
+    assert dst.read_bytes() == src.read_bytes()
+    assert dst.stat().st_mtime_ns == src.stat().st_mtime_ns
+
+
+def test_fastcopy(src, tmp_path):
+    dst = tmp_path / 'dst.wasm'
+    _io._fastcopy(src, dst)
+    assert_copied(src, dst)
+
+
+def test_fastcopy_falls_back_when_copy_file_range_fails(src, tmp_path, monkeypatch):
+    def refuse(*args):
+        raise OSError(errno.EXDEV, 'cross-device')
+
+    monkeypatch.setattr(os, 'copy_file_range', refuse, raising=False)
+    dst = tmp_path / 'dst.wasm'
+    _io._fastcopy(src, dst)
+    assert_copied(src, dst)
+
+
+def test_fastcopy_falls_back_on_short_copy_file_range(src, tmp_path, monkeypatch):
+    calls = []
+
+    def short(src_fd, dst_fd, count):
+        calls.append(count)
+        if len(calls) > 1:
+            return 0
+        os.write(dst_fd, os.read(src_fd, 1024))
+        return 1024
+
+    monkeypatch.setattr(os, 'copy_file_range', short, raising=False)
+    dst = tmp_path / 'dst.wasm'
+    _io._fastcopy(src, dst)
+    assert len(calls) == 2
+    assert_copied(src, dst)
+
+
+def test_fastcopy_without_copy_file_range(src, tmp_path, monkeypatch):
+    monkeypatch.delattr(os, 'copy_file_range', raising=False)
+    dst = tmp_path / 'dst.wasm'
+    _io._fastcopy(src, dst)
+    assert_copied(src, dst)